@@ -1,86 +1,178 @@
 """
-Упрощенный менеджер камеры - Singleton с надежным управлением ресурсами
+Упрощенный менеджер камеры с надежным управлением ресурсами
 """
 import cv2
+import collections
+import functools
+import os
+import sys
 import threading
 import time
 import logging
 from typing import Optional, Callable
 import numpy as np
-from PyQt5.QtCore import QObject, pyqtSignal, QTimer
+from PyQt5.QtCore import QObject, pyqtSignal
 
-from config import CAMERA_INDEX, CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS
+from config import (CAMERA_INDEX, CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS, CAMERA_FOURCC,
+                    FRAME_POOL_SIZE, RESIZE_SCALE, CAPTURE_THREAD_CORE)
 
 logger = logging.getLogger(__name__)
 
 class CameraManager(QObject):
     """
-    Singleton менеджер камеры с простой архитектурой
+    Менеджер камеры с простой архитектурой.
+    Общий экземпляр возвращает get_camera_manager()
     """
     
-    # Убираем numpy сигнал - он вызывает вылеты
+    # Сигнал несет только номер кадра, а не numpy массив (он вызывал вылеты
+    # и копировался в очередь событий Qt); сам кадр берется из пула буферов
+    frame_ready = pyqtSignal(int)
     camera_started = pyqtSignal()
     camera_stopped = pyqtSignal()
     camera_error = pyqtSignal(str)
     
-    _instance = None
-    _lock = threading.Lock()
-    
-    def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
-    
     def __init__(self):
-        if hasattr(self, '_initialized') and self._initialized:
-            return
-            
         super().__init__()
         
+        # Преобразования кадров небольшие: пул потоков OpenCV только
+        # отнимает ядра у GUI и распознавания
+        cv2.setNumThreads(1)
+        try:
+            cv2.ocl.setUseOpenCL(True)
+        except Exception as e:
+            logger.debug(f"OpenCL недоступен: {e}")
+        
         # Состояние камеры
         self._is_running = False
         self._cap = None
         self._capture_thread = None
         
-        # Подписчики на кадры
-        self._frame_callbacks = []
+        # Подписчики на кадры, разделенные по типу, указанному при подписке.
+        # Неизменяемые кортежи пересоздаются при (от)подписке под блокировкой,
+        # поэтому читаются в цикле кадров без блокировки
+        self._gui_callbacks: tuple = ()
+        self._worker_callbacks: tuple = ()
         self._callbacks_lock = threading.Lock()
         
         # Настройки
         self.camera_index = CAMERA_INDEX
         
-        # Последний кадр для GUI
-        self._latest_frame = None
-        self._frame_lock = threading.Lock()
+        # Backend, с которым камера успешно открылась, пробуется первым
+        # при следующих запусках
+        self._last_good_backend: Optional[int] = None
         
-        # Таймер для GUI обновлений
-        self._gui_timer = QTimer()
-        self._gui_timer.timeout.connect(self._emit_frame_to_gui)
+        # Реальный размер буфера драйвера (не все backend'ы соблюдают 1)
+        self._camera_buffer_size = 1
+        
+        # Пул переиспользуемых буферов кадров: поток захвата берет свободный
+        # буфер, пишет в него кадр и публикует его как последний, а ранее
+        # опубликованный буфер возвращается в конец пула
+        self._frame_pool = collections.deque(
+            np.empty((CAMERA_HEIGHT, CAMERA_WIDTH, 3), dtype=np.uint8)
+            for _ in range(FRAME_POOL_SIZE)
+        )
+        self._latest_frame: Optional[np.ndarray] = None
+        
+        # Номер последнего опубликованного кадра (пишет только поток захвата)
+        self._frame_seq = 0
+        
+        # Кольцо времен последних кадров (monotonic_ns) для расчета
+        # реальной частоты кадров по скользящему окну
+        self._frame_times = collections.deque(maxlen=CAMERA_FPS)
+        
+        # Уменьшенная копия последнего кадра (RESIZE_SCALE), общая для всех
+        # рабочих подписчиков, и номер кадра, из которого она получена
+        self._small_frame: Optional[np.ndarray] = None
+        self._small_frame_seq = -1
+        
+        # RGB копия последнего кадра для отображения в Qt (буфер
+        # переиспользуется) и номер кадра, из которого она получена
+        self._rgb_frame: Optional[np.ndarray] = None
+        self._rgb_frame_seq = -1
+        
+        # Отправка кадров в GUI: сигнал из потока захвата доставляется
+        # в GUI поток через очередь событий Qt
+        self.frame_ready.connect(self._emit_frame_to_gui)
         
-        self._initialized = True
         logger.info("CameraManager инициализирован")
     
-    def subscribe_to_frames(self, callback: Callable[[np.ndarray], None]):
-        """Подписаться на получение кадров"""
+    def subscribe_to_frames(self, callback: Callable[[np.ndarray], None], *,
+                            kind: str = 'worker'):
+        """
+        Подписаться на получение кадров
+        kind='gui' - вызов в GUI потоке для отображения, кадр в формате RGB,
+        kind='worker' - вызов в потоке захвата для обработки, кадр в формате BGR
+        Кадры передаются только для чтения, всегда uint8 - не приводите их
+        к float целиком, масштабирование оставьте распознавателю.
+        Буфер кадра переиспользуется пулом через FRAME_POOL_SIZE - 1 кадров:
+        не храните ссылку после выхода из callback, при необходимости .copy()
+        """
+        if kind not in ('gui', 'worker'):
+            raise ValueError(f"Неизвестный тип подписчика: {kind}")
+        
         with self._callbacks_lock:
-            if callback not in self._frame_callbacks:
-                self._frame_callbacks.append(callback)
-                logger.debug(f"Добавлен подписчик на кадры")
+            if callback in self._gui_callbacks or callback in self._worker_callbacks:
+                return
+            
+            if kind == 'gui':
+                self._gui_callbacks = self._gui_callbacks + (callback,)
+            else:
+                self._worker_callbacks = self._worker_callbacks + (callback,)
+            logger.debug(f"Добавлен подписчик на кадры ({kind})")
     
     def unsubscribe_from_frames(self, callback: Callable[[np.ndarray], None]):
         """Отписаться от получения кадров"""
         with self._callbacks_lock:
-            if callback in self._frame_callbacks:
-                self._frame_callbacks.remove(callback)
+            if callback in self._gui_callbacks:
+                self._gui_callbacks = tuple(cb for cb in self._gui_callbacks if cb != callback)
+                logger.debug(f"Удален подписчик кадров")
+            elif callback in self._worker_callbacks:
+                self._worker_callbacks = tuple(cb for cb in self._worker_callbacks if cb != callback)
                 logger.debug(f"Удален подписчик кадров")
     
-    def get_latest_frame(self):
-        """Получить последний кадр безопасно"""
-        with self._frame_lock:
-            return self._latest_frame.copy() if self._latest_frame is not None else None
+    def get_small_frame(self) -> Optional[np.ndarray]:
+        """
+        Получить последний кадр, уменьшенный в RESIZE_SCALE раз.
+        Уменьшение выполняется один раз на кадр, сколько бы подписчиков его
+        ни запрашивали. Вызывать из рабочих подписчиков (поток захвата)
+        """
+        # Номер читается до кадра (поток захвата пишет их в обратном
+        # порядке): кадр не старше номера, под которым он кэшируется
+        frame_seq = self._frame_seq
+        frame = self._latest_frame
+        if frame is None:
+            return None
+        
+        if self._small_frame_seq != frame_seq:
+            self._small_frame = cv2.resize(
+                frame, (0, 0), dst=self._small_frame,
+                fx=RESIZE_SCALE, fy=RESIZE_SCALE, interpolation=cv2.INTER_AREA
+            )
+            self._small_frame_seq = frame_seq
+        
+        return self._small_frame
+    
+    def get_rgb_frame(self) -> Optional[np.ndarray]:
+        """
+        Получить последний кадр в формате RGB (только для чтения).
+        Преобразование выполняется в переиспользуемый буфер один раз на кадр:
+        следующий кадр его перезапишет, поэтому ссылку не хранить.
+        Вызывать из GUI потока
+        """
+        # Номер читается до кадра (поток захвата пишет их в обратном
+        # порядке): кадр не старше номера, под которым он кэшируется
+        frame_seq = self._frame_seq
+        frame = self._latest_frame
+        if frame is None:
+            return None
+        
+        if self._rgb_frame_seq != frame_seq:
+            self._rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_frame)
+            self._rgb_frame_seq = frame_seq
+        
+        view = self._rgb_frame.view()
+        view.flags.writeable = False
+        return view
     
     def start_camera(self) -> bool:
         """Запуск камеры"""
@@ -92,13 +184,12 @@ class CameraManager(QObject):
             logger.info("Запуск камеры...")
             
             # Попытка открыть камеру с разными backend'ами
-            backends = [cv2.CAP_DSHOW, cv2.CAP_ANY]
-            
-            for backend in backends:
+            for backend in self._get_backends():
                 try:
                     self._cap = cv2.VideoCapture(self.camera_index, backend)
                     if self._cap.isOpened():
                         logger.info(f"Камера открыта с backend: {backend}")
+                        self._last_good_backend = backend
                         break
                     else:
                         if self._cap:
@@ -119,14 +210,16 @@ class CameraManager(QObject):
             if not ret or frame is None:
                 raise RuntimeError("Не удалось получить кадр с камеры")
             
+            # Пул буферов и все подписчики рассчитаны на 8-битные кадры (1 байт
+            # на канал); проверяется один раз при запуске, а не на каждом кадре
+            if frame.dtype != np.uint8:
+                raise RuntimeError(f"Неподдерживаемый формат кадра: {frame.dtype}")
+            
             # Запуск потока захвата
             self._is_running = True
             self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
             self._capture_thread.start()
             
-            # Запуск GUI таймера
-            self._gui_timer.start(33)  # ~30 FPS
-            
             self.camera_started.emit()
             logger.info("Камера успешно запущена")
             return True
@@ -138,6 +231,21 @@ class CameraManager(QObject):
             self.camera_error.emit(error_msg)
             return False
     
+    def _get_backends(self) -> list:
+        """Backend'ы для открытия камеры: только подходящие для платформы"""
+        if sys.platform == 'win32':
+            backends = [cv2.CAP_DSHOW, cv2.CAP_ANY]
+        elif sys.platform.startswith('linux'):
+            backends = [cv2.CAP_V4L2, cv2.CAP_ANY]
+        else:
+            backends = [cv2.CAP_ANY]
+        
+        if self._last_good_backend is not None:
+            backends = [self._last_good_backend] + [
+                backend for backend in backends if backend != self._last_good_backend
+            ]
+        return backends
+    
     def stop_camera(self):
         """Остановка камеры"""
         if not self._is_running:
@@ -147,9 +255,6 @@ class CameraManager(QObject):
         logger.info("Остановка камеры...")
         self._is_running = False
         
-        # Остановка GUI таймера
-        self._gui_timer.stop()
-        
         # Ожидание завершения потока
         if self._capture_thread and self._capture_thread.is_alive():
             self._capture_thread.join(timeout=3.0)
@@ -166,6 +271,12 @@ class CameraManager(QObject):
             return
         
         try:
+            # Формат потока: MJPG в разы уменьшает трафик по USB по сравнению
+            # с несжатым YUYV; при отказе драйвера остается формат по умолчанию
+            if CAMERA_FOURCC:
+                if not self._cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*CAMERA_FOURCC)):
+                    logger.info(f"Камера не поддерживает формат {CAMERA_FOURCC}")
+            
             # Настройка разрешения
             self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
             self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
@@ -175,22 +286,42 @@ class CameraManager(QObject):
             
             # Настройка буферизации
             self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            self._camera_buffer_size = max(1, int(self._cap.get(cv2.CAP_PROP_BUFFERSIZE) or 1))
             
             # Получение реальных параметров
-            actual_width = int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            actual_height = int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            actual_fps = self._cap.get(cv2.CAP_PROP_FPS)
+            camera_info = self._read_camera_info()
             
-            logger.info(f"Параметры камеры: {actual_width}x{actual_height} @ {actual_fps} FPS")
+            logger.info(
+                f"Параметры камеры: {camera_info['width']}x{camera_info['height']} "
+                f"@ {camera_info['fps']} FPS, формат {camera_info['fourcc']}"
+            )
             
         except Exception as e:
             logger.warning(f"Ошибка настройки камеры: {e}")
     
+    @staticmethod
+    def _decode_fourcc(value: float) -> str:
+        """Преобразование числового CAP_PROP_FOURCC в строку вида 'MJPG'"""
+        code = int(value)
+        return ''.join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+    
     def _capture_loop(self):
         """Основной цикл захвата кадров"""
         consecutive_errors = 0
         max_consecutive_errors = 10
         
+        # Сколько устаревших кадров накопил драйвер, пока работали подписчики
+        stale_frames = 0
+        
+        # Константы конфигурации как локальные переменные цикла
+        frame_shape = (CAMERA_HEIGHT, CAMERA_WIDTH, 3)
+        camera_fps = CAMERA_FPS
+        now_ns = time.monotonic_ns
+        frame_times = self._frame_times
+        frame_times.clear()
+        
+        self._tune_capture_thread()
+        
         while self._is_running:
             try:
                 if not self._cap or not self._cap.isOpened():
@@ -199,8 +330,26 @@ class CameraManager(QObject):
                         break
                     continue
                 
-                ret, frame = self._cap.read()
-                if not ret or frame is None:
+                # Захват в свободный буфер пула без выделения памяти.
+                # Если реальное разрешение камеры отличается от настроенного,
+                # OpenCV выделит новый массив - он и заменит буфер в пуле
+                if self._frame_pool:
+                    buffer = self._frame_pool.popleft()
+                else:
+                    buffer = np.empty(frame_shape, dtype=np.uint8)
+                
+                # Устаревшие кадры пропускаются дешевым grab() без декодирования
+                for _ in range(stale_frames):
+                    self._cap.grab()
+                stale_frames = 0
+                
+                if self._cap.grab():
+                    ret, frame = self._cap.retrieve(buffer)
+                else:
+                    ret, frame = False, None
+                
+                if not ret or frame is None or frame.size == 0:
+                    self._frame_pool.appendleft(buffer)
                     consecutive_errors += 1
                     if consecutive_errors >= max_consecutive_errors:
                         if self._is_running:
@@ -214,19 +363,30 @@ class CameraManager(QObject):
                 # Сброс счетчика ошибок при успешном чтении
                 consecutive_errors = 0
                 
-                # Проверка валидности кадра
-                if frame.size == 0:
-                    continue
+                # Публикация кадра для GUI, предыдущий буфер возвращается в пул.
+                # Порядок важен: сначала кадр, затем номер (читатели - наоборот)
+                previous_frame = self._latest_frame
+                self._latest_frame = frame
+                if previous_frame is not None:
+                    self._frame_pool.append(previous_frame)
+                self._frame_seq += 1
+                
+                # Уведомление GUI сразу после публикации: перерисовка
+                # не ждёт распознавания в рабочих подписчиках
+                self.frame_ready.emit(self._frame_seq)
                 
-                # Сохранение последнего кадра для GUI
-                with self._frame_lock:
-                    self._latest_frame = frame.copy()
+                # Одно чтение часов на кадр: и для FPS, и для замера подписчиков
+                distribute_start = now_ns()
+                frame_times.append(distribute_start)
                 
                 # Отправка кадра подписчикам (без GUI)
                 self._distribute_frame(frame)
                 
-                # Небольшая пауза
-                time.sleep(0.01)
+                # Если подписчики работали дольше кадра, драйвер с буфером
+                # больше одного кадра успел накопить устаревшие кадры
+                if self._camera_buffer_size > 1:
+                    busy_frames = (now_ns() - distribute_start) * camera_fps // 1_000_000_000
+                    stale_frames = min(self._camera_buffer_size - 1, busy_frames)
                 
             except Exception as e:
                 consecutive_errors += 1
@@ -246,40 +406,63 @@ class CameraManager(QObject):
             except:
                 pass
     
-    def _emit_frame_to_gui(self):
-        """Безопасная отправка кадра в GUI через таймер"""
+    def _tune_capture_thread(self):
+        """
+        Привязка потока захвата к ядру (CAPTURE_THREAD_CORE). Вызывается из
+        самого потока захвата; при отсутствии прав привязка пропускается.
+        Приоритет потока не повышается: в нем же выполняются подписчики,
+        включая распознавание, и он вытеснял бы GUI поток и запись логов
+        """
+        if CAPTURE_THREAD_CORE is not None and hasattr(os, 'sched_setaffinity'):
+            try:
+                os.sched_setaffinity(0, {CAPTURE_THREAD_CORE})
+                logger.info(f"Поток захвата привязан к ядру {CAPTURE_THREAD_CORE}")
+            except OSError as e:
+                logger.warning(f"Не удалось привязать поток захвата к ядру: {e}")
+    
+    def _emit_frame_to_gui(self, frame_seq: int):
+        """Безопасная отправка кадра в GUI (слот сигнала frame_ready)"""
         if not self._is_running:
             return
+        
+        # В очереди событий уже есть более новый кадр - этот пропускаем
+        if frame_seq != self._frame_seq:
+            return
             
-        frame = self.get_latest_frame()
+        if not self._gui_callbacks:
+            return
+        
+        # Один BGR->RGB проход на кадр для всех GUI подписчиков
+        frame = self.get_rgb_frame()
         if frame is not None:
             # Вызываем GUI callback напрямую
             try:
-                # Найдем GUI callback (обычно первый в списке)
-                with self._callbacks_lock:
-                    gui_callbacks = [cb for cb in self._frame_callbacks 
-                                   if 'display_frame' in str(cb) or 'on_frame_ready' in str(cb)]
-                
-                for callback in gui_callbacks:
+                for callback in self._gui_callbacks:
                     try:
-                        callback(frame.copy())
+                        callback(frame)
                     except Exception as e:
                         logger.error(f"Ошибка в GUI callback: {e}")
             except Exception as e:
                 logger.error(f"Ошибка отправки кадра в GUI: {e}")
     
     def _distribute_frame(self, frame: np.ndarray):
-        """Распространение кадра подписчикам (кроме GUI)"""
-        with self._callbacks_lock:
-            callbacks_copy = self._frame_callbacks.copy()
+        """
+        Распространение кадра подписчикам (кроме GUI). Подписчики получают
+        представление только для чтения: буфер принадлежит пулу и после
+        FRAME_POOL_SIZE - 1 следующих кадров перезаписывается - сохранять
+        кадр дольше вызова можно только через .copy()
+        """
+        worker_callbacks = self._worker_callbacks
+        if not worker_callbacks:
+            return
+        
+        view = frame.view()
+        view.flags.writeable = False
         
-        for callback in callbacks_copy:
+        # GUI callbacks хранятся отдельно и вызываются по сигналу frame_ready
+        for callback in worker_callbacks:
             try:
-                # Пропускаем GUI callbacks - они обрабатываются отдельно
-                if 'display_frame' in str(callback) or 'on_frame_ready' in str(callback):
-                    continue
-                    
-                callback(frame.copy())
+                callback(view)
             except Exception as e:
                 logger.error(f"Ошибка в callback: {e}")
     
@@ -294,29 +477,30 @@ class CameraManager(QObject):
             finally:
                 self._cap = None
         
-        with self._frame_lock:
+        if self._latest_frame is not None:
+            self._frame_pool.append(self._latest_frame)
             self._latest_frame = None
     
     def is_running(self) -> bool:
         """Проверка, работает ли камера"""
         return self._is_running
     
-    def get_camera_info(self) -> dict:
-        """Получение информации о камере"""
-        if not self._cap:
-            return {'status': 'not_initialized'}
-        
-        try:
-            return {
-                'status': 'running' if self._is_running else 'stopped',
-                'width': int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
-                'height': int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
-                'fps': self._cap.get(cv2.CAP_PROP_FPS),
-                'backend': self._cap.getBackendName() if hasattr(self._cap, 'getBackendName') else 'unknown'
-            }
-        except Exception as e:
-            logger.error(f"Ошибка получения информации о камере: {e}")
-            return {'status': 'error'}
+    def get_current_fps(self) -> float:
+        """Реальная частота кадров по времени последних CAMERA_FPS кадров"""
+        frame_times = tuple(self._frame_times)
+        if len(frame_times) < 2 or not self._is_running:
+            return 0.0
+        return (len(frame_times) - 1) * 1e9 / (frame_times[-1] - frame_times[0])
+    
+    def _read_camera_info(self) -> dict:
+        """Чтение параметров камеры из драйвера (медленные вызовы cap.get)"""
+        return {
+            'width': int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': self._cap.get(cv2.CAP_PROP_FPS),
+            'fourcc': self._decode_fourcc(self._cap.get(cv2.CAP_PROP_FOURCC)),
+            'backend': self._cap.getBackendName() if hasattr(self._cap, 'getBackendName') else 'unknown'
+        }
     
     def __del__(self):
         """Деструктор"""
@@ -326,5 +510,7 @@ class CameraManager(QObject):
         except:
             pass
 
-# Глобальный экземпляр менеджера камеры
-camera_manager = CameraManager()
\ No newline at end of file
+@functools.lru_cache(maxsize=1)
+def get_camera_manager() -> CameraManager:
+    """Общий экземпляр менеджера камеры (создается при первом вызове)"""
+    return CameraManager()
\ No newline at end of file
@@ -1,35 +1,41 @@
 """
 Упрощенная конфигурация системы распознавания лиц
 """
-import os
+import functools
 from pathlib import Path
+from typing import Final
 
 # Базовые пути
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / 'data'
 LOGS_DIR = BASE_DIR / 'logs'
 
-# Создание директорий
-for directory in [DATA_DIR, LOGS_DIR]:
-    directory.mkdir(exist_ok=True)
-
 # Поддиректории
 USER_PHOTOS_DIR = DATA_DIR / 'user_photos'
-USER_PHOTOS_DIR.mkdir(exist_ok=True)
+
+
+@functools.cache
+def ensure_directories():
+    """Создание рабочих директорий (однократно за процесс, не при импорте)"""
+    for directory in (DATA_DIR, LOGS_DIR, USER_PHOTOS_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
 
 # База данных
 DATABASE_PATH = DATA_DIR / 'database.db'
+DATABASE_POOL_SIZE = 4  # Максимум простаивающих соединений SQLite в пуле
 
 # Настройки камеры
 CAMERA_INDEX = 0
-CAMERA_WIDTH = 640
-CAMERA_HEIGHT = 480
-CAMERA_FPS = 30
+CAMERA_WIDTH: Final[int] = 640
+CAMERA_HEIGHT: Final[int] = 480
+CAMERA_FPS: Final[int] = 30
+CAMERA_FOURCC = 'MJPG'  # Формат потока камеры (None - формат драйвера по умолчанию)
 
 # Настройки распознавания лиц
-FACE_RECOGNITION_TOLERANCE = 0.6
-RESIZE_SCALE = 0.25  # Уменьшение кадра для ускорения
+FACE_RECOGNITION_TOLERANCE: Final[float] = 0.6
+RESIZE_SCALE: Final[float] = 0.25  # Уменьшение кадра для ускорения
 MIN_FACE_SIZE = 50
+FACE_DETECTION_MODEL = 'hog'  # 'hog' - CPU, 'cnn' - CNN детектор dlib (быстр только с CUDA)
 RECOGNITION_COOLDOWN = 3  # Секунды между распознаваниями одного лица
 
 # Настройки UI
@@ -48,6 +54,8 @@ SUCCESS_COLOR = "#28a745"
 DEFAULT_ADMIN_USERNAME = 'admin'
 DEFAULT_ADMIN_PASSWORD = 'admin123'
 PASSWORD_MIN_LENGTH = 6
+PASSWORD_HASH_MIN_ITERATIONS = 100000  # Нижняя граница итераций PBKDF2
+PASSWORD_HASH_TARGET_SECONDS = 0.05  # Время хеширования, под которое подбираются итерации
 
 # Логирование
 LOG_LEVEL = 'INFO'
@@ -56,6 +64,11 @@ LOG_MAX_BYTES = 10 * 1024 * 1024  # 10MB
 LOG_BACKUP_COUNT = 5
 
 # Производительность
-MAX_RECOGNITION_WORKERS = 2
 FRAME_SKIP = 3  # Обрабатывать каждый N-й кадр
-MAX_FACE_ENCODINGS_CACHE = 1000
\ No newline at end of file
+MOTION_THRESHOLD = 2.0  # Средняя разница яркости миниатюр (0-255), ниже - сцена статична
+MOTION_MAX_IDLE_FRAMES = 30  # Без движения детекция все равно запускается раз в N кадров
+FRAME_POOL_SIZE = 4  # Количество переиспользуемых буферов кадров камеры
+CAPTURE_THREAD_CORE = None  # Ядро CPU для потока захвата (None - без привязки)
+MAX_FACE_ENCODINGS_CACHE = 1000
+LOG_WRITE_BATCH_SIZE = 500  # Максимум логов распознавания в одной транзакции
+LOG_WRITE_INTERVAL = 0.1  # Секунды накопления логов перед записью
\ No newline at end of file
@@ -4,51 +4,234 @@
 import sqlite3
 import hashlib
 import json
+import atexit
+import collections
+import functools
+import hmac
 import logging
 import os
+import queue
 import threading
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 from contextlib import contextmanager
 import secrets
 
-from config import DATABASE_PATH, DEFAULT_ADMIN_USERNAME, DEFAULT_ADMIN_PASSWORD
+import numpy as np
+
+from config import (DATABASE_PATH, DATABASE_POOL_SIZE, DEFAULT_ADMIN_USERNAME, DEFAULT_ADMIN_PASSWORD,
+                    PASSWORD_HASH_MIN_ITERATIONS, PASSWORD_HASH_TARGET_SECONDS,
+                    LOG_WRITE_BATCH_SIZE, LOG_WRITE_INTERVAL, ensure_directories)
 
 logger = logging.getLogger(__name__)
 
+# Настройки каждого соединения. Режим журнала WAL сохраняется в файле БД
+# и включается один раз при создании таблиц; synchronous=NORMAL безопасен
+# только вместе с WAL
+_CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",  # 64 МБ кэша страниц
+    "PRAGMA mmap_size = 268435456",  # 256 МБ чтения через mmap
+    "PRAGMA journal_size_limit = 67108864",  # WAL усекается до 64 МБ после checkpoint
+)
+
+# Запросы горячих путей (вход, запись логов) - константы модуля: одинаковый
+# текст запроса гарантирует попадание в кэш подготовленных выражений sqlite3
+_SQL_SELECT_ADMIN = (
+    "SELECT id, username, email, password_hash, salt, iterations, is_active "
+    "FROM admins WHERE username = ?"
+)
+_SQL_UPDATE_ADMIN_LOGIN = "UPDATE admins SET last_login = ? WHERE id = ?"
+_SQL_UPDATE_ADMIN_REHASH_LOGIN = (
+    "UPDATE admins SET password_hash = ?, salt = ?, iterations = ?, last_login = ? "
+    "WHERE id = ?"
+)
+_SQL_INSERT_RECOGNITION_LOG = (
+    "INSERT INTO recognition_logs (user_id, timestamp, confidence, recognition_type) "
+    "VALUES (?, ?, ?, ?)"
+)
+
+# Мьютексы записи по пути к файлу БД: общие для всех экземпляров Database
+# одного процесса, открывших тот же файл
+_WRITE_LOCKS: Dict[str, threading.Lock] = {}
+
+# Столбцы users без кодировки лица: списки и карточки пользователей не
+# тянут BLOB, если кодировка не нужна
+_USER_COLUMNS = "id, user_id, full_name, email, phone, photo_path, is_active, created_at, created_by"
+
+@functools.cache
+def _calibrate_hash_iterations() -> int:
+    """
+    Подбор числа итераций PBKDF2 под PASSWORD_HASH_TARGET_SECONDS на текущем
+    CPU (однократно за процесс). Время PBKDF2 линейно по итерациям, поэтому
+    достаточно одного пробного замера
+    """
+    probe_iterations = 20000
+    start = time.perf_counter()
+    hashlib.pbkdf2_hmac('sha256', b'calibration', b'calibration', probe_iterations)
+    elapsed = time.perf_counter() - start
+    
+    iterations = int(probe_iterations * PASSWORD_HASH_TARGET_SECONDS / max(elapsed, 1e-6))
+    iterations = max(PASSWORD_HASH_MIN_ITERATIONS, iterations // 1000 * 1000)
+    logger.info(f"Итерации PBKDF2 для новых паролей: {iterations}")
+    return iterations
+
+# Версия схемы в PRAGMA user_version: при совпадении создание таблиц,
+# индексов и добавление столбцов пропускаются
+SCHEMA_VERSION = 5
+
+
+def _now_ms() -> int:
+    """Текущее время в миллисекундах Unix (формат столбцов времени с версии схемы 4)"""
+    return time.time_ns() // 1_000_000
+
+
+def _today_bounds_ms() -> tuple:
+    """Границы текущих суток по местному времени в миллисекундах Unix"""
+    midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return (int(midnight.timestamp() * 1000),
+            int((midnight + timedelta(days=1)).timestamp() * 1000))
+
+
+# Строка для построения галереи лиц: без словаря на каждую строку
+UserEncodingRow = collections.namedtuple('UserEncodingRow', ['id', 'user_id', 'full_name', 'face_encoding'])
+
+
+def _encode_face_encoding(encoding) -> Optional[bytes]:
+    """Кодировка лица -> BLOB из float32 (512 байт вместо ~3 КБ JSON)"""
+    if encoding is None or len(encoding) == 0:
+        return None
+    return np.asarray(encoding, dtype=np.float32).tobytes()
+
+
+def _decode_face_encoding(value) -> np.ndarray:
+    """BLOB -> массив float32 без копирования (только для чтения)"""
+    if not value:
+        return np.empty(0, dtype=np.float32)
+    if isinstance(value, str):
+        # Строка JSON из БД, созданной до версии схемы 2
+        return np.asarray(json.loads(value), dtype=np.float32)
+    return np.frombuffer(value, dtype=np.float32)
+
+
+def _user_encoding_row(cursor: sqlite3.Cursor, row: tuple) -> UserEncodingRow:
+    """row_factory для iter_face_encodings (поврежденная кодировка - пустой массив)"""
+    try:
+        encoding = _decode_face_encoding(row[3])
+    except ValueError:
+        encoding = np.empty(0, dtype=np.float32)
+    return UserEncodingRow(row[0], row[1], row[2], encoding)
+
 class Database:
     """Упрощенная база данных с автоматической инициализацией"""
     
     def __init__(self):
         self.db_path = str(DATABASE_PATH)
-        self._lock = threading.RLock()
+        
+        # Пул готовых соединений (LIFO - последнее возвращенное соединение
+        # с самым "теплым" кэшем страниц берется первым)
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=DATABASE_POOL_SIZE)
+        # Один пишущий поток за раз: SQLite все равно допускает одного
+        # писателя, а ожидание на мьютексе дешевле опроса busy_timeout
+        # (setdefault атомарен - все экземпляры получают один мьютекс)
+        self._write_lock = _WRITE_LOCKS.setdefault(os.path.abspath(self.db_path), threading.Lock())
+        
+        ensure_directories()
         
         # Создание БД и таблиц
         self._create_database()
         self._create_default_admin()
         
+        # Логи распознавания пишутся фоновым потоком пачками: вызывающий
+        # поток (поток захвата камеры) не ждет коммита
+        self._log_queue: queue.Queue = queue.Queue()
+        self._log_writer = threading.Thread(
+            target=self._recognition_log_writer, name='RecognitionLogWriter', daemon=True
+        )
+        self._log_writer.start()
+        atexit.register(self.close)
+        
         logger.info(f"База данных инициализирована: {self.db_path}")
     
+    def _open_connection(self) -> sqlite3.Connection:
+        """Открытие и настройка нового соединения (PRAGMA - один раз)"""
+        conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False,
+                               cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
     @contextmanager
     def get_connection(self):
-        """Получение соединения с базой данных"""
-        with self._lock:
+        """
+        Получение соединения с базой данных из пула. Соединение используется
+        одним потоком до выхода из блока; при ошибке оно не возвращается в пул
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
             try:
-                conn = sqlite3.connect(self.db_path, timeout=30.0)
-                conn.row_factory = sqlite3.Row
-                conn.execute("PRAGMA foreign_keys = ON")
-                yield conn
+                conn = self._open_connection()
             except Exception as e:
                 logger.error(f"Ошибка подключения к БД: {e}")
                 raise
-            finally:
-                conn.close()
+        
+        try:
+            yield conn
+        except BaseException:
+            # В т.ч. GeneratorExit при закрытии недочитанного iter_users
+            conn.close()
+            raise
+        
+        try:
+            # Незафиксированные изменения не переходят к следующему владельцу
+            if conn.in_transaction:
+                conn.rollback()
+            self._pool.put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            conn.close()
+    
+    @contextmanager
+    def get_write_connection(self):
+        """
+        Соединение для изменяющих запросов: удерживает мьютекс записи до
+        выхода из блока. Чтение (в режиме WAL) идет через get_connection
+        параллельно с записью
+        """
+        with self._write_lock:
+            with self.get_connection() as conn:
+                yield conn
     
     def _create_database(self):
         """Создание таблиц базы данных"""
-        with self.get_connection() as conn:
+        with self.get_write_connection() as conn:
             cursor = conn.cursor()
             
+            # Чтение заголовка файла вместо разбора sqlite_master
+            cursor.execute("PRAGMA user_version")
+            user_version = cursor.fetchone()[0]
+            if user_version > SCHEMA_VERSION:
+                # БД создана более новой версией приложения: миграции не
+                # запускаются и версия схемы не понижается
+                logger.warning(f"Версия схемы БД {user_version} новее поддерживаемой "
+                               f"{SCHEMA_VERSION}, обновление схемы пропущено")
+                return
+            if user_version == SCHEMA_VERSION:
+                logger.debug("Схема базы данных актуальна")
+                return
+            
+            # WAL: запись логов не блокирует чтение и не требует fsync
+            # на каждую транзакцию
+            cursor.execute("PRAGMA journal_mode = WAL")
+            journal_mode = cursor.fetchone()[0]
+            if journal_mode.lower() != 'wal':
+                # Например, БД в памяти или на сетевом диске без общей памяти
+                logger.warning(f"Режим WAL недоступен, используется журнал {journal_mode}")
+            
             # Таблица администраторов
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS admins (
@@ -57,9 +240,10 @@ class Database:
                     email TEXT NOT NULL,
                     password_hash TEXT NOT NULL,
                     salt TEXT NOT NULL,
+                    iterations INTEGER NOT NULL DEFAULT 100000,
                     is_active INTEGER DEFAULT 1,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_login TIMESTAMP NULL
+                    last_login INTEGER NULL
                 )
             ''')
             
@@ -72,7 +256,7 @@ class Database:
                     email TEXT DEFAULT '',
                     phone TEXT DEFAULT '',
                     photo_path TEXT,
-                    face_encoding TEXT,
+                    face_encoding BLOB,
                     is_active INTEGER DEFAULT 1,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     created_by INTEGER,
@@ -85,34 +269,73 @@ class Database:
                 CREATE TABLE IF NOT EXISTS recognition_logs (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     user_id INTEGER NOT NULL,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    timestamp INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER) * 1000),
                     confidence REAL NOT NULL,
                     recognition_type TEXT DEFAULT 'SUCCESS',
                     FOREIGN KEY (user_id) REFERENCES users (id)
                 )
             ''')
             
+            # Добавление столбцов, появившихся после создания старых БД
+            admin_columns = {row['name'] for row in cursor.execute("PRAGMA table_info(admins)")}
+            if 'iterations' not in admin_columns:
+                cursor.execute('ALTER TABLE admins ADD COLUMN iterations INTEGER NOT NULL DEFAULT 100000')
+            
             # Индексы для оптимизации
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_active ON users (is_active)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_user_id ON users (user_id)')
+            # Список активных пользователей читается по индексу уже
+            # отсортированным по имени; user_id индексируется ограничением UNIQUE
+            cursor.execute('DROP INDEX IF EXISTS idx_users_active')
+            cursor.execute('DROP INDEX IF EXISTS idx_users_user_id')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_active_name ON users (is_active, full_name)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_recognition_timestamp ON recognition_logs (timestamp)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_recognition_user ON recognition_logs (user_id)')
+            # Составной индекс покрывает и поиск по user_id (внешний ключ),
+            # и последние распознавания пользователя
+            cursor.execute('DROP INDEX IF EXISTS idx_recognition_user')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_recognition_user_ts ON recognition_logs (user_id, timestamp DESC)')
+            
+            # Версия 2: кодировки лиц из JSON-текста в BLOB float32
+            cursor.execute("SELECT id, face_encoding FROM users WHERE typeof(face_encoding) = 'text'")
+            converted = []
+            for row in cursor.fetchall():
+                try:
+                    converted.append((_encode_face_encoding(json.loads(row['face_encoding'])), row['id']))
+                except ValueError as e:
+                    logger.warning(f"Не удалось преобразовать кодировку пользователя ID {row['id']}: {e}")
+            if converted:
+                cursor.executemany("UPDATE users SET face_encoding = ? WHERE id = ?", converted)
+                logger.info(f"Кодировки лиц преобразованы в BLOB: {len(converted)}")
             
+            # Версия 4: время логов из текста ISO (UTC) в миллисекунды Unix
+            cursor.execute('''
+                UPDATE recognition_logs
+                SET timestamp = CAST(strftime('%s', timestamp) AS INTEGER) * 1000
+                WHERE typeof(timestamp) = 'text'
+            ''')
+            if cursor.rowcount > 0:
+                logger.info(f"Время логов распознавания преобразовано: {cursor.rowcount}")
+            cursor.execute('''
+                UPDATE admins
+                SET last_login = CAST(strftime('%s', last_login, 'utc') AS INTEGER) * 1000
+                WHERE typeof(last_login) = 'text'
+            ''')
+            
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
             conn.commit()
             logger.info("Таблицы базы данных созданы/проверены")
     
-    def _hash_password(self, password: str, salt: str) -> str:
-        """Хеширование пароля"""
+    def _hash_password(self, password: str, salt: str,
+                       iterations: int = PASSWORD_HASH_MIN_ITERATIONS) -> str:
+        """Хеширование пароля (число итераций хранится вместе с хешем)"""
         return hashlib.pbkdf2_hmac(
             'sha256',
             password.encode('utf-8'),
             salt.encode('utf-8'),
-            100000
+            iterations
         ).hex()
     
     def _create_default_admin(self):
         """Создание администратора по умолчанию"""
-        with self.get_connection() as conn:
+        with self.get_write_connection() as conn:
             cursor = conn.cursor()
             
             # Проверка существования администратора
@@ -120,16 +343,18 @@ class Database:
             
             if not cursor.fetchone():
                 salt = secrets.token_hex(32)
-                password_hash = self._hash_password(DEFAULT_ADMIN_PASSWORD, salt)
+                iterations = _calibrate_hash_iterations()
+                password_hash = self._hash_password(DEFAULT_ADMIN_PASSWORD, salt, iterations)
                 
                 cursor.execute('''
-                    INSERT INTO admins (username, email, password_hash, salt)
-                    VALUES (?, ?, ?, ?)
+                    INSERT INTO admins (username, email, password_hash, salt, iterations)
+                    VALUES (?, ?, ?, ?, ?)
                 ''', (
                     DEFAULT_ADMIN_USERNAME,
                     'admin@company.com',
                     password_hash,
-                    salt
+                    salt,
+                    iterations
                 ))
                 
                 conn.commit()
@@ -141,10 +366,7 @@ class Database:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute('''
-                    SELECT id, username, email, password_hash, salt, is_active
-                    FROM admins WHERE username = ?
-                ''', (username,))
+                cursor.execute(_SQL_SELECT_ADMIN, (username,))
                 
                 admin = cursor.fetchone()
                 
@@ -158,16 +380,34 @@ class Database:
                     return None
                 
                 # Проверка пароля
-                password_hash = self._hash_password(password, admin_dict['salt'])
-                if password_hash != admin_dict['password_hash']:
+                password_hash = self._hash_password(password, admin_dict['salt'],
+                                                    admin_dict['iterations'])
+                if not hmac.compare_digest(password_hash, admin_dict['password_hash']):
                     return None
                 
-                # Обновление времени последнего входа
-                cursor.execute('''
-                    UPDATE admins SET last_login = ? WHERE id = ?
-                ''', (datetime.now(), admin_dict['id']))
+                # Перехеширование при входе, если хеш слабее текущей нормы.
+                # Порог вдвое ниже калибровки: замер времени меняется от
+                # запуска к запуску, и без запаса пароль перехешировался бы
+                # почти при каждом входе. Калибровка и PBKDF2 выполняются
+                # до захвата мьютекса записи, общего с записью логов
+                target_iterations = _calibrate_hash_iterations()
+                rehash_below = max(PASSWORD_HASH_MIN_ITERATIONS, target_iterations // 2)
+                rehash = admin_dict['iterations'] < rehash_below
+                if rehash:
+                    salt = secrets.token_hex(32)
+                    update = (_SQL_UPDATE_ADMIN_REHASH_LOGIN, (
+                        self._hash_password(password, salt, target_iterations),
+                        salt, target_iterations, _now_ms(), admin_dict['id']
+                    ))
+                else:
+                    update = (_SQL_UPDATE_ADMIN_LOGIN, (_now_ms(), admin_dict['id']))
                 
-                conn.commit()
+                # Под мьютексом - только UPDATE (одна транзакция, один коммит)
+                with self._write_lock, conn:
+                    conn.execute(*update)
+                
+                if rehash:
+                    logger.info(f"Пароль администратора {admin_dict['username']} перехеширован")
                 
                 return {
                     'id': admin_dict['id'],
@@ -182,7 +422,7 @@ class Database:
     def add_user(self, user_data: Dict, created_by: int) -> Optional[int]:
         """Добавление нового пользователя"""
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
@@ -195,7 +435,7 @@ class Database:
                     user_data.get('email', ''),
                     user_data.get('phone', ''),
                     user_data.get('photo_path', ''),
-                    json.dumps(user_data.get('face_encoding', [])),
+                    _encode_face_encoding(user_data.get('face_encoding')),
                     created_by
                 ))
                 
@@ -212,49 +452,137 @@ class Database:
             logger.error(f"Ошибка добавления пользователя: {e}")
             return None
     
-    def get_all_users(self, active_only: bool = True) -> List[Dict]:
-        """Получение всех пользователей"""
+    def add_users_bulk(self, users_data: List[Dict], created_by: int) -> int:
+        """
+        Массовое добавление пользователей (импорт): одна транзакция и один
+        коммит на весь список. Уже существующие user_id пропускаются;
+        возвращает число добавленных
+        """
+        rows = [(
+            user_data['user_id'],
+            user_data['full_name'],
+            user_data.get('email', ''),
+            user_data.get('phone', ''),
+            user_data.get('photo_path', ''),
+            _encode_face_encoding(user_data.get('face_encoding')),
+            created_by
+        ) for user_data in users_data]
+        
+        try:
+            with self.get_write_connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO users 
+                    (user_id, full_name, email, phone, photo_path, face_encoding, created_by)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+                added = cursor.rowcount
+                conn.commit()
+                
+                logger.info(f"Импортировано пользователей: {added} из {len(rows)}")
+                return added
+                
+        except Exception as e:
+            logger.error(f"Ошибка массового добавления пользователей: {e}")
+            return 0
+    
+    def iter_users(self, active_only: bool = True, with_encodings: bool = True) -> Iterator[Dict]:
+        """
+        Потоковое чтение пользователей пачками по 256 строк: кодировки
+        декодируются по мере чтения, весь результат в памяти не держится.
+        Соединение занято до исчерпания или закрытия генератора.
+        with_encodings=False - без столбца face_encoding
+        """
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
+                cursor.arraysize = 256
                 
-                query = "SELECT * FROM users"
+                query = f"SELECT {_USER_COLUMNS}"
+                if with_encodings:
+                    query += ", face_encoding"
+                query += " FROM users"
                 if active_only:
                     query += " WHERE is_active = 1"
                 query += " ORDER BY full_name"
                 
                 cursor.execute(query)
-                users = cursor.fetchall()
+                while True:
+                    users = cursor.fetchmany()
+                    if not users:
+                        break
+                    
+                    for user in users:
+                        user_dict = dict(user)
+                        if with_encodings:
+                            try:
+                                user_dict['face_encoding'] = _decode_face_encoding(user_dict['face_encoding'])
+                            except ValueError:
+                                user_dict['face_encoding'] = np.empty(0, dtype=np.float32)
+                        yield user_dict
                 
-                result = []
-                for user in users:
-                    user_dict = dict(user)
-                    try:
-                        user_dict['face_encoding'] = json.loads(user_dict['face_encoding'] or '[]')
-                    except:
-                        user_dict['face_encoding'] = []
-                    result.append(user_dict)
+        except Exception as e:
+            logger.error(f"Ошибка получения пользователей: {e}")
+    
+    def iter_face_encodings(self) -> Iterator[UserEncodingRow]:
+        """
+        Потоковое чтение кодировок активных пользователей для галереи лиц:
+        только нужные столбцы, строки - кортежи UserEncodingRow вместо dict
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.arraysize = 256
+                cursor.row_factory = _user_encoding_row
                 
-                return result
+                cursor.execute('''
+                    SELECT id, user_id, full_name, face_encoding
+                    FROM users
+                    WHERE is_active = 1 AND face_encoding IS NOT NULL
+                ''')
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+                    yield from rows
                 
         except Exception as e:
-            logger.error(f"Ошибка получения пользователей: {e}")
-            return []
+            logger.error(f"Ошибка получения кодировок лиц: {e}")
+    
+    def get_all_users(self, active_only: bool = True, with_encodings: bool = True) -> List[Dict]:
+        """Получение всех пользователей"""
+        return list(self.iter_users(active_only, with_encodings))
     
-    def get_user_by_id(self, user_id: int) -> Optional[Dict]:
+    def get_user_count(self, active_only: bool = True) -> int:
+        """Количество пользователей (по индексу, без чтения строк)"""
+        try:
+            with self.get_connection() as conn:
+                query = "SELECT COUNT(*) FROM users"
+                if active_only:
+                    query += " WHERE is_active = 1"
+                return conn.execute(query).fetchone()[0]
+        except Exception as e:
+            logger.error(f"Ошибка подсчета пользователей: {e}")
+            return 0
+    
+    def get_user_by_id(self, user_id: int, with_encodings: bool = True) -> Optional[Dict]:
         """Получение пользователя по ID"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+                if with_encodings:
+                    cursor.execute(f"SELECT {_USER_COLUMNS}, face_encoding FROM users WHERE id = ?", (user_id,))
+                else:
+                    cursor.execute(f"SELECT {_USER_COLUMNS} FROM users WHERE id = ?", (user_id,))
                 user = cursor.fetchone()
                 
                 if user:
                     user_dict = dict(user)
-                    try:
-                        user_dict['face_encoding'] = json.loads(user_dict['face_encoding'] or '[]')
-                    except:
-                        user_dict['face_encoding'] = []
+                    if with_encodings:
+                        try:
+                            user_dict['face_encoding'] = _decode_face_encoding(user_dict['face_encoding'])
+                        except ValueError:
+                            user_dict['face_encoding'] = np.empty(0, dtype=np.float32)
                     return user_dict
                 
                 return None
@@ -263,10 +591,27 @@ class Database:
             logger.error(f"Ошибка получения пользователя: {e}")
             return None
     
+    def get_users_fingerprint(self) -> Optional[List[int]]:
+        """
+        Дешевый отпечаток состава активных пользователей (количество,
+        максимальный и суммарный id) для проверки актуальности кэша кодировок
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT COUNT(*), COALESCE(MAX(id), 0), COALESCE(SUM(id), 0)
+                    FROM users WHERE is_active = 1
+                ''')
+                return list(cursor.fetchone())
+        except Exception as e:
+            logger.error(f"Ошибка получения отпечатка пользователей: {e}")
+            return None
+    
     def delete_user(self, user_id: int):
         """Удаление пользователя (мягкое удаление)"""
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("UPDATE users SET is_active = 0 WHERE id = ?", (user_id,))
                 conn.commit()
@@ -274,23 +619,104 @@ class Database:
         except Exception as e:
             logger.error(f"Ошибка удаления пользователя: {e}")
     
-    def add_recognition_log(self, user_id: int, confidence: float, recognition_type: str = 'SUCCESS') -> Optional[int]:
-        """Добавление лога распознавания"""
+    def add_recognition_log(self, user_id: int, confidence: float, recognition_type: str = 'SUCCESS') -> bool:
+        """
+        Добавление лога распознавания. Запись ставится в очередь и выполняется
+        фоновым потоком в течение LOG_WRITE_INTERVAL; возвращает False, если
+        запись уже остановлена
+        """
+        if not self._log_writer.is_alive():
+            logger.error("Запись логов распознавания остановлена")
+            return False
+        
+        # Время фиксируется в момент распознавания
+        self._log_queue.put((user_id, _now_ms(), confidence, recognition_type))
+        return True
+    
+    def _recognition_log_writer(self):
+        """Фоновый поток: запись накопленных логов одной транзакцией"""
+        running = True
+        while running:
+            rows = [self._log_queue.get()]
+            
+            # Дособираем логи, поступившие за LOG_WRITE_INTERVAL
+            deadline = time.monotonic() + LOG_WRITE_INTERVAL
+            while len(rows) < LOG_WRITE_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    rows.append(self._log_queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            # None - сигнал остановки от close()
+            running = None not in rows
+            batch = [row for row in rows if row is not None]
+            
+            try:
+                if batch:
+                    self.add_recognition_logs_bulk(batch)
+            finally:
+                for _ in rows:
+                    self._log_queue.task_done()
+    
+    def add_recognition_logs_bulk(self, logs: List[tuple]) -> bool:
+        """
+        Запись логов распознавания одной транзакцией. Элементы -
+        (user_id, timestamp, confidence, recognition_type), время в мс Unix.
+        Если пакет отклонен (например, пользователь уже удален), строки
+        записываются по одной: теряются только ошибочные. Возвращает True,
+        если записаны все логи
+        """
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO recognition_logs (user_id, confidence, recognition_type)
-                    VALUES (?, ?, ?)
-                ''', (user_id, confidence, recognition_type))
+            with self.get_write_connection() as conn:
+                try:
+                    conn.executemany(_SQL_INSERT_RECOGNITION_LOG, logs)
+                    conn.commit()
+                    return True
+                except sqlite3.Error as e:
+                    conn.rollback()
+                    logger.warning(f"Пакет логов распознавания ({len(logs)} шт.) отклонен: {e}, "
+                                   f"запись по одному")
                 
-                log_id = cursor.lastrowid
+                # Ошибка отдельного INSERT откатывает только его, а не транзакцию
+                failed = 0
+                for log in logs:
+                    try:
+                        conn.execute(_SQL_INSERT_RECOGNITION_LOG, log)
+                    except sqlite3.Error as e:
+                        failed += 1
+                        logger.error(f"Лог распознавания {log} не записан: {e}")
                 conn.commit()
-                return log_id
-                
+                return failed == 0
         except Exception as e:
-            logger.error(f"Ошибка добавления лога распознавания: {e}")
-            return None
+            logger.error(f"Ошибка записи логов распознавания ({len(logs)} шт.): {e}")
+            return False
+    
+    def flush_logs(self):
+        """Ожидание записи всех логов распознавания из очереди"""
+        if self._log_writer.is_alive():
+            self._log_queue.join()
+    
+    def close(self):
+        """Запись оставшихся логов, остановка фонового потока и закрытие пула"""
+        if self._log_writer.is_alive():
+            self._log_queue.put(None)
+            self._log_writer.join(timeout=5.0)
+        
+        # Перенос WAL в основной файл с усечением журнала
+        try:
+            with self.get_connection() as conn:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except Exception as e:
+            logger.error(f"Ошибка checkpoint WAL: {e}")
+        
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
     
     def get_recognition_report(self, limit: int = 100) -> List[Dict]:
         """Получение отчета по распознаванию"""
@@ -298,7 +724,8 @@ class Database:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
-                    SELECT r.*, u.full_name, u.user_id as user_code
+                    SELECT r.id, r.user_id, r.timestamp, r.confidence, r.recognition_type,
+                           u.full_name, u.user_id as user_code
                     FROM recognition_logs r
                     JOIN users u ON r.user_id = u.id
                     ORDER BY r.timestamp DESC
@@ -306,7 +733,14 @@ class Database:
                 ''', (limit,))
                 
                 records = cursor.fetchall()
-                return [dict(rec) for rec in records]
+                result = []
+                for rec in records:
+                    rec_dict = dict(rec)
+                    rec_dict['timestamp'] = datetime.fromtimestamp(
+                        rec_dict['timestamp'] / 1000
+                    ).strftime('%Y-%m-%d %H:%M:%S')
+                    result.append(rec_dict)
+                return result
                 
         except Exception as e:
             logger.error(f"Ошибка получения отчета: {e}")
@@ -320,8 +754,8 @@ class Database:
                 cursor.execute('''
                     SELECT COUNT(*) 
                     FROM recognition_logs 
-                    WHERE DATE(timestamp) = DATE('now')
-                ''')
+                    WHERE timestamp >= ? AND timestamp < ?
+                ''', _today_bounds_ms())
                 return cursor.fetchone()[0]
         except Exception as e:
             logger.error(f"Ошибка получения счетчика за сегодня: {e}")
@@ -335,9 +769,15 @@ class Database:
                 cursor.execute('''
                     SELECT COUNT(DISTINCT user_id) 
                     FROM recognition_logs 
-                    WHERE DATE(timestamp) = DATE('now')
-                ''')
+                    WHERE timestamp >= ? AND timestamp < ?
+                ''', _today_bounds_ms())
                 return cursor.fetchone()[0]
         except Exception as e:
             logger.error(f"Ошибка получения уникальных пользователей: {e}")
-            return 0
\ No newline at end of file
+            return 0
+
+
+@functools.lru_cache(maxsize=1)
+def get_database() -> Database:
+    """Общий экземпляр базы данных (создается при первом вызове)"""
+    return Database()
\ No newline at end of file
@@ -7,21 +7,27 @@ import numpy as np
 import threading
 import time
 import logging
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+from collections import OrderedDict
+from typing import Callable, List, Dict, Optional, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
-import pickle
+import json
 import os
 
 from config import (
-    FACE_RECOGNITION_TOLERANCE, RESIZE_SCALE, 
+    FACE_RECOGNITION_TOLERANCE, RESIZE_SCALE, FACE_DETECTION_MODEL,
     RECOGNITION_COOLDOWN, FRAME_SKIP, MAX_FACE_ENCODINGS_CACHE,
-    DATA_DIR
+    MOTION_THRESHOLD, MOTION_MAX_IDLE_FRAMES, DATA_DIR
 )
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Производные от настроек величины, вычисляемые один раз при импорте
+# (а не на каждое лицо в кадре)
+_TOLERANCE_SQ = FACE_RECOGNITION_TOLERANCE ** 2
+_INVERSE_SCALE = 1.0 / RESIZE_SCALE
+
+@dataclass(slots=True, frozen=True)
 class FaceMatch:
     """Результат распознавания лица"""
     user_id: int
@@ -29,15 +35,15 @@ class FaceMatch:
     full_name: str
     confidence: float
     face_location: Tuple[int, int, int, int]
-    timestamp: float
+    timestamp: float  # time.monotonic() начала обработки кадра
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CachedUser:
     """Кэшированные данные пользователя"""
     id: int
     user_id: str
     full_name: str
-    encoding: np.ndarray
+    encoding: np.ndarray = field(compare=False)  # Массив не участвует в == и hash()
 
 class FaceRecognitionEngine:
     """
@@ -50,15 +56,42 @@ class FaceRecognitionEngine:
         
         # Кэш известных лиц
         self._cached_users: List[CachedUser] = []
-        self._cache_lock = threading.RLock()
-        self._cache_file = DATA_DIR / 'face_encodings_cache.pkl'
+        # Блокировка только между изменяющими кэш; распознавание читает
+        # опубликованный снимок _gallery без нее
+        self._cache_lock = threading.Lock()
+        
+        # Кодировки кэшированных пользователей одной непрерывной матрицей
+        # (N, 128) float32 и квадраты их норм - пересобираются при изменении
+        # кэша, чтобы не собирать список массивов на каждом кадре
+        self._known_matrix = np.empty((0, 128), dtype=np.float32)
+        self._known_norms_sq = np.empty(0, dtype=np.float32)
+        
+        # Согласованный снимок (пользователи, матрица, квадраты норм):
+        # публикуется одним присваиванием после каждого изменения кэша
+        self._gallery = (self._cached_users, self._known_matrix, self._known_norms_sq)
+        
+        # Индекс: id пользователя в БД -> строка матрицы и списка кэша
+        self._id_to_row: Dict[int, int] = {}
+        # Кэш на диске: матрица кодировок float16 (.npy) и данные
+        # пользователей в том же порядке строк (.json)
+        self._cache_file = DATA_DIR / 'face_encodings_cache.npy'
+        self._cache_meta_file = DATA_DIR / 'face_encodings_cache.json'
+        
+        # Кэш последних распознаваний для cooldown, упорядочен по времени
+        # (самые старые записи в начале)
+        self._last_recognitions: 'OrderedDict[int, float]' = OrderedDict()
         
-        # Кэш последних распознаваний для cooldown
-        self._last_recognitions: Dict[int, float] = {}
+        # Модель детектора лиц: CNN имеет смысл только если dlib собран с CUDA
+        self._detection_model = self._select_detection_model()
         
         # Счетчик кадров для пропуска
         self._frame_counter = 0
         
+        # Серая миниатюра последнего обработанного кадра для проверки
+        # движения и число кадров, пропущенных из-за статичной сцены
+        self._motion_reference: Optional[np.ndarray] = None
+        self._idle_frames = 0
+        
         # Статистика
         self._stats = {
             'frames_processed': 0,
@@ -73,74 +106,175 @@ class FaceRecognitionEngine:
         
         self.logger.info("FaceRecognitionEngine инициализирован")
     
+    def _select_detection_model(self) -> str:
+        """Выбор модели детектора с учетом FACE_DETECTION_MODEL и наличия CUDA"""
+        if FACE_DETECTION_MODEL != 'cnn':
+            return 'hog'
+        
+        try:
+            import dlib
+            if getattr(dlib, 'DLIB_USE_CUDA', False) and dlib.cuda.get_num_devices() > 0:
+                self.logger.info("Детектор лиц: CNN (dlib, CUDA)")
+                return 'cnn'
+        except Exception as e:
+            self.logger.debug(f"Проверка CUDA в dlib не удалась: {e}")
+        
+        self.logger.warning("dlib собран без CUDA, CNN детектор заменен на HOG")
+        return 'hog'
+    
     def _load_face_encodings(self):
         """Загрузка кодировок лиц с кэшированием"""
         try:
-            # Попытка загрузки из кэша
-            if self._cache_file.exists():
-                cache_time = os.path.getmtime(self._cache_file)
-                if time.time() - cache_time < 3600:  # Кэш действителен 1 час
-                    self._load_from_cache()
-                    return
+            # Кэш действителен, пока не изменился состав пользователей в БД
+            fingerprint = self.db.get_users_fingerprint()
+            if fingerprint is not None and self._load_from_cache(fingerprint):
+                return
             
             # Загрузка из базы данных
             self._load_from_database()
-            self._save_to_cache()
+            self._save_to_cache(fingerprint)
             
         except Exception as e:
             self.logger.error(f"Ошибка загрузки кодировок лиц: {e}")
-            self._cached_users = []
+            with self._cache_lock:
+                self._cached_users = []
+                self._rebuild_known_matrix()
     
     def _load_from_database(self):
         """Загрузка лиц из базы данных"""
         self.logger.info("Загрузка кодировок лиц из базы данных...")
         
-        with self._cache_lock:
-            self._cached_users = []
+        # Чтение БД - без блокировки, распознавание продолжает работать
+        # на прежнем снимке до публикации нового
+        cached_users = []
+        try:
+            for user in self.db.iter_face_encodings():
+                if user.face_encoding.shape == (128,):  # Проверка размерности
+                    cached_users.append(CachedUser(
+                        id=user.id,
+                        user_id=user.user_id,
+                        full_name=user.full_name,
+                        encoding=user.face_encoding
+                    ))
+                else:
+                    self.logger.warning(f"Пропуск пользователя {user.user_id}: "
+                                        f"размер кодировки {user.face_encoding.shape}")
             
-            try:
-                users = self.db.get_all_users()
-                
-                for user in users:
-                    if user['face_encoding']:
-                        try:
-                            encoding = np.array(user['face_encoding'])
-                            if encoding.shape == (128,):  # Проверка размерности
-                                cached_user = CachedUser(
-                                    id=user['id'],
-                                    user_id=user['user_id'],
-                                    full_name=user['full_name'],
-                                    encoding=encoding
-                                )
-                                self._cached_users.append(cached_user)
-                        except Exception as e:
-                            self.logger.warning(f"Пропуск пользователя {user['user_id']}: {e}")
-                
-                self.logger.info(f"Загружено {len(self._cached_users)} кодировок лиц")
-            except Exception as e:
-                self.logger.error(f"Ошибка доступа к базе данных: {e}")
+            self.logger.info(f"Загружено {len(cached_users)} кодировок лиц")
+        except Exception as e:
+            self.logger.error(f"Ошибка доступа к базе данных: {e}")
+        
+        with self._cache_lock:
+            self._cached_users = cached_users
+            self._rebuild_known_matrix()
     
-    def _load_from_cache(self):
-        """Загрузка из кэша"""
+    def _load_from_cache(self, fingerprint: List[int]) -> bool:
+        """Загрузка из кэша, если он соответствует отпечатку пользователей БД"""
         try:
-            with open(self._cache_file, 'rb') as f:
-                data = pickle.load(f)
-                with self._cache_lock:
-                    self._cached_users = data['users']
+            with open(self._cache_meta_file, 'r', encoding='utf-8') as f:
+                cache_meta = json.load(f)
+            
+            if cache_meta.get('fingerprint') != fingerprint:
+                self.logger.info("Кэш кодировок устарел: состав пользователей изменился")
+                return False
+            users_meta = cache_meta['users']
+            
+            # Отображение файла без pickle, float32 - одним приведением
+            encodings = np.load(self._cache_file, mmap_mode='r')
+            if encodings.shape != (len(users_meta), 128):
+                raise ValueError(f"размер матрицы {encodings.shape} не совпадает с метаданными")
+            matrix = np.asarray(encodings, dtype=np.float32)
+            
+            cached_users = [
+                CachedUser(
+                    id=meta['id'],
+                    user_id=meta['user_id'],
+                    full_name=meta['full_name'],
+                    encoding=matrix[row]
+                )
+                for row, meta in enumerate(users_meta)
+            ]
+            
+            with self._cache_lock:
+                self._cached_users = cached_users
+                self._rebuild_known_matrix()
             self.logger.info(f"Загружено {len(self._cached_users)} кодировок из кэша")
+            return True
+        except FileNotFoundError:
+            return False
         except Exception as e:
             self.logger.error(f"Ошибка загрузки кэша: {e}")
-            self._load_from_database()
+            return False
+    
+    def _rebuild_known_matrix(self):
+        """Пересборка матрицы кодировок из кэша (вызывать под _cache_lock)"""
+        if self._cached_users:
+            matrix = np.ascontiguousarray(
+                np.stack([user.encoding for user in self._cached_users]),
+                dtype=np.float32
+            )
+        else:
+            matrix = np.empty((0, 128), dtype=np.float32)
+        
+        # Новые объекты, а не запись на месте: потоки распознавания
+        # дочитывают прежнюю матрицу без блокировки
+        self._known_norms_sq = np.einsum('ij,ij->i', matrix, matrix)
+        self._known_matrix = matrix
+        self._id_to_row = {user.id: row for row, user in enumerate(self._cached_users)}
+        self._gallery = (self._cached_users, matrix, self._known_norms_sq)
     
-    def _save_to_cache(self):
-        """Сохранение в кэш"""
+    def _remove_cached_row(self, user_id: int) -> bool:
+        """
+        Удаление пользователя из кэша перестановкой: на место удаляемой
+        строки переносится последняя. Строка находится по индексу без поиска,
+        но массивы копируются (копирование при записи) - O(N), зато без
+        повторного np.stack и пересчета норм (вызывать под _cache_lock)
+        """
+        row = self._id_to_row.pop(user_id, None)
+        if row is None:
+            return False
+        
+        last_row = len(self._cached_users) - 1
+        cached_users = self._cached_users[:last_row]
+        matrix = self._known_matrix[:last_row].copy()
+        norms_sq = self._known_norms_sq[:last_row].copy()
+        
+        if row != last_row:
+            moved_user = self._cached_users[last_row]
+            cached_users[row] = moved_user
+            matrix[row] = self._known_matrix[last_row]
+            norms_sq[row] = self._known_norms_sq[last_row]
+            self._id_to_row[moved_user.id] = row
+        
+        self._cached_users = cached_users
+        self._known_norms_sq = norms_sq
+        self._known_matrix = matrix
+        self._gallery = (cached_users, matrix, norms_sq)
+        return True
+    
+    def _save_to_cache(self, fingerprint: Optional[List[int]] = None):
+        """Сохранение в кэш вместе с отпечатком пользователей БД"""
         try:
+            if fingerprint is None:
+                fingerprint = self.db.get_users_fingerprint()
+            
             os.makedirs(os.path.dirname(self._cache_file), exist_ok=True)
-            with open(self._cache_file, 'wb') as f:
-                pickle.dump({
-                    'users': self._cached_users,
+            
+            cached_users, known_matrix, _ = self._gallery
+            
+            # Метаданные с отпечатком пишутся последними: кэш считается
+            # действительным только после записи матрицы
+            np.save(self._cache_file, known_matrix.astype(np.float16))
+            
+            with open(self._cache_meta_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'users': [
+                        {'id': user.id, 'user_id': user.user_id, 'full_name': user.full_name}
+                        for user in cached_users
+                    ],
+                    'fingerprint': fingerprint,
                     'timestamp': time.time()
-                }, f)
+                }, f, ensure_ascii=False)
             self.logger.debug("Кэш кодировок лиц сохранен")
         except Exception as e:
             self.logger.error(f"Ошибка сохранения кэша: {e}")
@@ -155,23 +289,34 @@ class FaceRecognitionEngine:
         except Exception as e:
             self.logger.error(f"Ошибка перезагрузки кодировок: {e}")
     
-    def process_frame(self, frame: np.ndarray) -> List[FaceMatch]:
+    def process_frame(self, frame: np.ndarray,
+                      get_small_frame: Optional[Callable[[], Optional[np.ndarray]]] = None) -> List[FaceMatch]:
         """
         Обработка кадра для распознавания лиц
+        get_small_frame - функция, возвращающая уже уменьшенный в RESIZE_SCALE
+        раз кадр; вызывается только для кадров, прошедших FRAME_SKIP
         """
         if frame is None or frame.size == 0:
             return []
         
-        start_time = time.time()
+        # Одно чтение часов на кадр: им помечаются все совпадения
+        start_time = time.monotonic()
         
         # Пропуск кадров для производительности
         self._frame_counter += 1
         if self._frame_counter % FRAME_SKIP != 0:
             return []
         
+        # Статичная сцена - детектор не запускается
+        if not self._has_motion(frame):
+            return []
+        
+        # Уменьшение - только для кадров, прошедших обе проверки
+        small_frame = get_small_frame() if get_small_frame is not None else None
+        
         try:
             # Детекция лиц
-            face_locations, face_encodings = self._detect_faces(frame)
+            face_locations, face_encodings = self._detect_faces(frame, small_frame)
             
             if not face_locations:
                 return []
@@ -180,7 +325,7 @@ class FaceRecognitionEngine:
             matches = []
             for location, encoding in zip(face_locations, face_encodings):
                 try:
-                    match = self._recognize_face(location, encoding)
+                    match = self._recognize_face(location, encoding, start_time)
                     if match and self._should_process_recognition(match):
                         matches.append(match)
                         self._update_last_recognition(match)
@@ -189,7 +334,7 @@ class FaceRecognitionEngine:
                     continue
             
             # Обновление статистики
-            processing_time = time.time() - start_time
+            processing_time = time.monotonic() - start_time
             self._update_stats(processing_time, len(face_locations), len(matches))
             
             return matches
@@ -198,27 +343,64 @@ class FaceRecognitionEngine:
             self.logger.error(f"Ошибка обработки кадра: {e}")
             return []
     
-    def _detect_faces(self, frame: np.ndarray) -> Tuple[List, List]:
+    def _has_motion(self, frame: np.ndarray) -> bool:
+        """
+        Дешевая проверка движения по серой миниатюре 64x48 относительно
+        последнего обработанного кадра. Раз в MOTION_MAX_IDLE_FRAMES проверок
+        кадр обрабатывается в любом случае (лицо могло быть не найдено)
+        """
+        try:
+            # Сначала уменьшение, затем перевод в серый - по 3072 пикселям
+            thumbnail = cv2.cvtColor(
+                cv2.resize(frame, (64, 48), interpolation=cv2.INTER_AREA),
+                cv2.COLOR_BGR2GRAY
+            )
+        except Exception as e:
+            self.logger.error(f"Ошибка проверки движения: {e}")
+            return True
+        
+        reference = self._motion_reference
+        if reference is not None and self._idle_frames < MOTION_MAX_IDLE_FRAMES:
+            difference = cv2.norm(thumbnail, reference, cv2.NORM_L1) / thumbnail.size
+            if difference < MOTION_THRESHOLD:
+                self._idle_frames += 1
+                return False
+        
+        self._motion_reference = thumbnail
+        self._idle_frames = 0
+        return True
+    
+    def _detect_faces(self, frame: np.ndarray,
+                      small_frame: Optional[np.ndarray] = None) -> Tuple[List, List]:
         """Детекция лиц на кадре"""
         try:
             # Проверка валидности кадра
             if frame is None or frame.size == 0:
                 return [], []
             
-            # Уменьшение кадра для ускорения
+            # Уменьшение кадра для ускорения (если не передан готовый)
             try:
-                small_frame = cv2.resize(frame, (0, 0), fx=RESIZE_SCALE, fy=RESIZE_SCALE)
+                if small_frame is None:
+                    small_frame = cv2.resize(frame, (0, 0), fx=RESIZE_SCALE, fy=RESIZE_SCALE)
                 if small_frame.size == 0:
                     return [], []
                 
-                rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+                # HOG детектору достаточно яркости: серый кадр в 3 раза меньше
+                # RGB, а RGB нужен только для кодировок найденных лиц.
+                # CNN детектор работает только с RGB
+                if self._detection_model == 'hog':
+                    rgb_frame = None
+                    detection_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY)
+                else:
+                    rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+                    detection_frame = rgb_frame
             except Exception as e:
                 self.logger.error(f"Ошибка обработки кадра: {e}")
                 return [], []
             
-            # Поиск лиц (используем быстрый HOG детектор)
+            # Поиск лиц (HOG на CPU по умолчанию, CNN dlib при сборке с CUDA)
             try:
-                face_locations = face_recognition.face_locations(rgb_frame, model='hog')
+                face_locations = face_recognition.face_locations(detection_frame, model=self._detection_model)
             except Exception as e:
                 self.logger.error(f"Ошибка поиска лиц: {e}")
                 return [], []
@@ -228,6 +410,8 @@ class FaceRecognitionEngine:
             
             # Создание кодировок
             try:
+                if rgb_frame is None:
+                    rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
                 face_encodings = face_recognition.face_encodings(rgb_frame, face_locations)
             except Exception as e:
                 self.logger.error(f"Ошибка создания кодировок: {e}")
@@ -238,10 +422,10 @@ class FaceRecognitionEngine:
             for top, right, bottom, left in face_locations:
                 try:
                     scaled_location = (
-                        int(top / RESIZE_SCALE),
-                        int(right / RESIZE_SCALE),
-                        int(bottom / RESIZE_SCALE),
-                        int(left / RESIZE_SCALE)
+                        int(top * _INVERSE_SCALE),
+                        int(right * _INVERSE_SCALE),
+                        int(bottom * _INVERSE_SCALE),
+                        int(left * _INVERSE_SCALE)
                     )
                     scaled_locations.append(scaled_location)
                 except Exception as e:
@@ -255,44 +439,32 @@ class FaceRecognitionEngine:
             return [], []
     
     def _recognize_face(self, location: Tuple[int, int, int, int], 
-                       encoding: np.ndarray) -> Optional[FaceMatch]:
+                       encoding: np.ndarray, timestamp: float) -> Optional[FaceMatch]:
         """Распознавание конкретного лица"""
         try:
-            with self._cache_lock:
-                if not self._cached_users:
-                    return None
-                
-                # Создаем копию для безопасности
-                cached_users = self._cached_users.copy()
+            # Согласованный снимок без блокировки: кортеж заменяется целиком
+            cached_users, known_matrix, known_norms_sq = self._gallery
             
             if not cached_users:
                 return None
             
-            # Извлечение кодировок для сравнения
-            try:
-                known_encodings = [user.encoding for user in cached_users]
-            except Exception as e:
-                self.logger.error(f"Ошибка извлечения кодировок: {e}")
-                return None
-            
-            # Быстрое сравнение с использованием векторизации
+            # Квадраты расстояний одним матричным умножением:
+            # |a - b|^2 = |a|^2 + |b|^2 - 2 a.b
             try:
-                distances = face_recognition.face_distance(known_encodings, encoding)
+                encoding = np.asarray(encoding, dtype=np.float32)
+                distances_sq = known_norms_sq + np.dot(encoding, encoding) - 2.0 * (known_matrix @ encoding)
             except Exception as e:
                 self.logger.error(f"Ошибка сравнения лиц: {e}")
                 return None
             
-            if len(distances) == 0:
-                return None
-            
-            # Поиск лучшего совпадения
+            # Поиск лучшего совпадения (корень только для найденного минимума)
             try:
-                min_distance_idx = np.argmin(distances)
-                min_distance = distances[min_distance_idx]
+                min_distance_idx = int(np.argmin(distances_sq))
+                min_distance_sq = max(float(distances_sq[min_distance_idx]), 0.0)
                 
-                if min_distance <= FACE_RECOGNITION_TOLERANCE:
+                if min_distance_sq <= _TOLERANCE_SQ:
                     user = cached_users[min_distance_idx]
-                    confidence = 1.0 - min_distance
+                    confidence = 1.0 - min_distance_sq ** 0.5
                     
                     return FaceMatch(
                         user_id=user.id,
@@ -300,7 +472,7 @@ class FaceRecognitionEngine:
                         full_name=user.full_name,
                         confidence=confidence,
                         face_location=location,
-                        timestamp=time.time()
+                        timestamp=timestamp
                     )
             except Exception as e:
                 self.logger.error(f"Ошибка поиска совпадения: {e}")
@@ -332,15 +504,15 @@ class FaceRecognitionEngine:
         """Обновление времени последнего распознавания"""
         try:
             self._last_recognitions[match.user_id] = match.timestamp
+            self._last_recognitions.move_to_end(match.user_id)
             
-            # Очистка старых записей
-            current_time = time.time()
-            expired_users = [
-                user_id for user_id, last_time in self._last_recognitions.items()
-                if current_time - last_time > RECOGNITION_COOLDOWN * 3
-            ]
-            
-            for user_id in expired_users:
+            # Очистка старых записей только с начала: первая актуальная
+            # запись означает, что дальше все записи новее
+            expire_before = match.timestamp - RECOGNITION_COOLDOWN * 3
+            while self._last_recognitions:
+                user_id, last_time = next(iter(self._last_recognitions.items()))
+                if last_time >= expire_before:
+                    break
                 del self._last_recognitions[user_id]
         except Exception as e:
             self.logger.error(f"Ошибка обновления времени распознавания: {e}")
@@ -372,8 +544,9 @@ class FaceRecognitionEngine:
     def add_new_face(self, user_data: dict):
         """Добавление нового лица в кэш"""
         try:
-            if user_data.get('face_encoding'):
-                encoding = np.array(user_data['face_encoding'])
+            encoding = user_data.get('face_encoding')
+            if encoding is not None and len(encoding):
+                encoding = np.asarray(encoding, dtype=np.float32)
                 if encoding.shape == (128,):
                     cached_user = CachedUser(
                         id=user_data['id'],
@@ -383,11 +556,18 @@ class FaceRecognitionEngine:
                     )
                     
                     with self._cache_lock:
-                        self._cached_users.append(cached_user)
+                        # Повторное добавление заменяет прежнюю кодировку
+                        # (матрица все равно пересобирается целиком ниже)
+                        cached_users = [user for user in self._cached_users
+                                        if user.id != cached_user.id]
+                        cached_users.append(cached_user)
                         
                         # Ограничение размера кэша
-                        if len(self._cached_users) > MAX_FACE_ENCODINGS_CACHE:
-                            self._cached_users = self._cached_users[-MAX_FACE_ENCODINGS_CACHE:]
+                        if len(cached_users) > MAX_FACE_ENCODINGS_CACHE:
+                            cached_users = cached_users[-MAX_FACE_ENCODINGS_CACHE:]
+                        
+                        self._cached_users = cached_users
+                        self._rebuild_known_matrix()
                     
                     self._save_to_cache()
                     self.logger.info(f"Добавлено новое лицо в кэш: {user_data['full_name']}")
@@ -398,10 +578,7 @@ class FaceRecognitionEngine:
         """Удаление лица из кэша"""
         try:
             with self._cache_lock:
-                self._cached_users = [
-                    user for user in self._cached_users 
-                    if user.id != user_id
-                ]
+                self._remove_cached_row(user_id)
             
             if user_id in self._last_recognitions:
                 del self._last_recognitions[user_id]
@@ -415,13 +592,14 @@ class FaceRecognitionEngine:
         """Очистка кэша"""
         try:
             with self._cache_lock:
-                self._cached_users.clear()
+                self._cached_users = []
+                self._rebuild_known_matrix()
             self._last_recognitions.clear()
             
-            if self._cache_file.exists():
+            for cache_file in (self._cache_file, self._cache_meta_file):
                 try:
-                    os.remove(self._cache_file)
-                except:
+                    os.remove(cache_file)
+                except OSError:
                     pass
             
             self.logger.info("Кэш кодировок лиц очищен")
@@ -3,6 +3,7 @@
 """
 import sys
 import os
+import importlib
 import logging
 from pathlib import Path
 
@@ -14,15 +15,14 @@ from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QPixmap, QFont, QPainter, QLinearGradient, QBrush, QColor
 
 from config import (WINDOW_TITLE, LOG_LEVEL, LOG_FORMAT, 
-                   LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOGS_DIR)
+                   LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOGS_DIR, ensure_directories)
 from ui.login_window import LoginWindow
-from ui.main_window import MainWindow
 
 def setup_logging():
     """Настройка логирования"""
     try:
         # Создание директории для логов
-        LOGS_DIR.mkdir(exist_ok=True)
+        ensure_directories()
         
         # Настройка логирования
         from logging.handlers import RotatingFileHandler
@@ -61,27 +61,21 @@ def setup_logging():
 
 def check_dependencies():
     """Проверка необходимых зависимостей"""
+    # Настоящий импорт, а не поиск модуля: поврежденный dlib или
+    # отсутствующие face_recognition_models обнаруживаются здесь, до окна входа
+    required = {
+        'cv2': 'opencv-python',
+        'face_recognition': 'face-recognition',
+        'numpy': 'numpy',
+        'PyQt5': 'PyQt5',
+    }
     missing_deps = []
-    
-    try:
-        import cv2
-    except ImportError:
-        missing_deps.append("opencv-python")
-    
-    try:
-        import face_recognition
-    except ImportError:
-        missing_deps.append("face-recognition")
-    
-    try:
-        import numpy
-    except ImportError:
-        missing_deps.append("numpy")
-    
-    try:
-        from PyQt5 import QtWidgets
-    except ImportError:
-        missing_deps.append("PyQt5")
+    for module, package in required.items():
+        try:
+            importlib.import_module(module)
+        except (Exception, SystemExit):
+            # face_recognition без моделей вызывает quit() при импорте
+            missing_deps.append(package)
     
     if missing_deps:
         return missing_deps
@@ -197,6 +191,17 @@ class FaceRecognitionApp:
         """Обработка успешного входа"""
         logging.info(f"Успешный вход пользователя: {admin_data['username']}")
         
+        # Главное окно (камера, распознавание) загружается только после входа;
+        # исключение в слоте Qt завершило бы приложение без сообщения
+        try:
+            from ui.main_window import MainWindow
+        except ImportError as e:
+            logging.error(f"Ошибка загрузки главного окна: {e}")
+            QMessageBox.critical(self.login_window, "Ошибка зависимостей",
+                                 f"Не удалось загрузить главное окно:\n{str(e)}")
+            self.app.quit()
+            return
+        
         if self.login_window:
             self.login_window.close()
         
@@ -265,9 +270,7 @@ def main():
             logging.warning("Камера недоступна - функции распознавания могут не работать")
         
         # Создание необходимых директорий
-        from config import DATA_DIR, USER_PHOTOS_DIR
-        for directory in [DATA_DIR, USER_PHOTOS_DIR, LOGS_DIR]:
-            directory.mkdir(exist_ok=True)
+        ensure_directories()
         
         logging.info("Необходимые директории созданы")
         
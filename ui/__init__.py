@@ -1,14 +1,29 @@
 """
 Пакет пользовательского интерфейса для системы распознавания лиц
 """
-from .login_window import LoginWindow
-from .main_window import MainWindow
-from .add_user_dialog import AddUserDialog
-from .face_recognition_widget import FaceRecognitionWidget
+import importlib
+
+# Модули окон импортируются лениво (PEP 562): импорт ui.login_window
+# не должен тянуть за собой cv2, face_recognition и камеру
+_LAZY_ATTRS = {
+    'LoginWindow': '.login_window',
+    'MainWindow': '.main_window',
+    'AddUserDialog': '.add_user_dialog',
+    'FaceRecognitionWidget': '.face_recognition_widget',
+}
 
 __all__ = [
     'LoginWindow',
     'MainWindow', 
     'AddUserDialog',
     'FaceRecognitionWidget'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
\ No newline at end of file
@@ -45,19 +45,23 @@ class CameraThread(QThread):
                 ret, frame = self.cap.read()
                 if not ret:
                     if self.is_running:
+                        # Пауза только при ошибке чтения, иначе цикл крутится вхолостую
+                        self.msleep(100)
                         continue
                     else:
                         break
                 
+                # read() каждый раз возвращает новый массив, поэтому один и тот же
+                # кадр передается в оба сигнала без копирования (не изменять на месте)
                 if self.is_running:
-                    self.frame_ready.emit(frame.copy())
+                    self.frame_ready.emit(frame)
                 
                 if self.is_running:
                     rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                     face_locations = face_recognition.face_locations(rgb_frame)
                     
                     if face_locations and self.is_running:
-                        self.face_detected.emit(frame.copy(), face_locations)
+                        self.face_detected.emit(frame, face_locations)
                         
             except Exception as e:
                 if self.is_running:
@@ -512,7 +516,7 @@ class AddUserDialog(QDialog):
         
         face_encodings = face_recognition.face_encodings(rgb_image, face_locations)
         if face_encodings:
-            self.face_encoding = face_encodings[0].tolist()
+            self.face_encoding = face_encodings[0].astype(np.float32)
             self.photo_path = file_path
             self.display_image_with_face_box(image, face_locations[0])
             QMessageBox.information(self, "Успех", "Лицо успешно обнаружено!")
@@ -599,7 +603,7 @@ class AddUserDialog(QDialog):
         self.detected_faces = []
     
     def update_camera_frame(self, frame):
-        self.current_frame = frame.copy()
+        self.current_frame = frame
         
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         height, width, channel = rgb_frame.shape
@@ -658,7 +662,7 @@ class AddUserDialog(QDialog):
             face_encodings = face_recognition.face_encodings(rgb_frame, self.detected_faces)
             
             if face_encodings:
-                self.face_encoding = face_encodings[0].tolist()
+                self.face_encoding = face_encodings[0].astype(np.float32)
                 
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 temp_filename = f"temp_capture_{timestamp}.jpg"
@@ -689,7 +693,7 @@ class AddUserDialog(QDialog):
             QMessageBox.warning(self, "Ошибка", "Введите полное имя пользователя")
             return
         
-        if not self.face_encoding:
+        if self.face_encoding is None:
             QMessageBox.warning(self, "Ошибка", "Добавьте фотографию пользователя")
             return
         
@@ -6,14 +6,13 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                            QSizePolicy, QMessageBox)
 from PyQt5.QtCore import Qt, QTimer, QDateTime
 from PyQt5.QtGui import QFont, QPixmap, QImage
-import cv2
 import numpy as np
 import os
 from datetime import datetime
 
 from config import (PRIMARY_COLOR, SECONDARY_COLOR, WARNING_COLOR, 
                    USER_PHOTOS_DIR)
-from camera_manager import camera_manager
+from camera_manager import get_camera_manager
 from face_recognition_engine import FaceRecognitionEngine
 
 class FaceRecognitionWidget(QWidget):
@@ -27,18 +26,18 @@ class FaceRecognitionWidget(QWidget):
         # Движок распознавания лиц
         self.recognition_engine = FaceRecognitionEngine(database)
         
+        # Общий менеджер камеры
+        self.camera_manager = get_camera_manager()
+        
         # Состояние
         self.is_camera_active = False
         self.current_user_info = None
         
-        # Флаг для предотвращения множественных обработок
-        self._processing_frame = False
-        
         self.init_ui()
         
         # УБИРАЕМ подключение к frame_ready сигналу - он вызывает вылеты
         # Используем только прямые callbacks
-        camera_manager.camera_error.connect(self.on_camera_error)
+        self.camera_manager.camera_error.connect(self.on_camera_error)
     
     def init_ui(self):
         """Инициализация интерфейса"""
@@ -270,12 +269,12 @@ class FaceRecognitionWidget(QWidget):
         
         try:
             # Подписка на кадры камеры для распознавания
-            camera_manager.subscribe_to_frames(self.process_frame_for_recognition)
+            self.camera_manager.subscribe_to_frames(self.process_frame_for_recognition)
             # Подписка на кадры для отображения
-            camera_manager.subscribe_to_frames(self.on_frame_ready)
+            self.camera_manager.subscribe_to_frames(self.on_frame_ready, kind='gui')
             
             # Запуск камеры
-            if camera_manager.start_camera():
+            if self.camera_manager.start_camera():
                 self.is_camera_active = True
                 self.start_button.setEnabled(False)
                 self.stop_button.setEnabled(True)
@@ -305,11 +304,11 @@ class FaceRecognitionWidget(QWidget):
             self.is_camera_active = False
             
             # Отписка от кадров
-            camera_manager.unsubscribe_from_frames(self.process_frame_for_recognition)
-            camera_manager.unsubscribe_from_frames(self.on_frame_ready)
+            self.camera_manager.unsubscribe_from_frames(self.process_frame_for_recognition)
+            self.camera_manager.unsubscribe_from_frames(self.on_frame_ready)
             
             # Остановка камеры
-            camera_manager.stop_camera()
+            self.camera_manager.stop_camera()
             
             # Обновление UI
             self.start_button.setEnabled(True)
@@ -345,14 +344,12 @@ class FaceRecognitionWidget(QWidget):
         except Exception as e:
             print(f"Ошибка отображения кадра: {e}")
     
-    def display_frame_simple(self, frame):
-        """Простое отображение кадра без сложных проверок"""
+    def display_frame_simple(self, rgb_frame):
+        """Простое отображение кадра (RGB от camera_manager) без сложных проверок"""
         try:
-            if frame is None or frame.size == 0:
+            if rgb_frame is None or rgb_frame.size == 0:
                 return
                 
-            # Простая конвертация
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             height, width, channel = rgb_frame.shape
             bytes_per_line = 3 * width
             
@@ -371,20 +368,23 @@ class FaceRecognitionWidget(QWidget):
             pass
     
     def process_frame_for_recognition(self, frame):
-        """Обработка кадра для распознавания лиц"""
-        if not self.is_camera_active or self._processing_frame:
+        """
+        Обработка кадра для распознавания лиц. Вызывается последовательно
+        из потока захвата, поэтому флаги повторного входа не нужны
+        """
+        if not self.is_camera_active:
             return
         
         try:
-            # Установка флага обработки
-            self._processing_frame = True
-            
             # Проверка валидности кадра
             if frame is None or frame.size == 0:
                 return
             
-            # Распознавание лиц
-            matches = self.recognition_engine.process_frame(frame)
+            # Распознавание лиц (уменьшенный кадр общий для всех подписчиков,
+            # запрашивается движком только для обрабатываемых кадров)
+            matches = self.recognition_engine.process_frame(
+                frame, self.camera_manager.get_small_frame
+            )
             
             if matches:
                 # Берем первое найденное лицо
@@ -397,15 +397,12 @@ class FaceRecognitionWidget(QWidget):
                 
         except Exception as e:
             print(f"Ошибка распознавания: {e}")
-        finally:
-            # Сброс флага обработки
-            self._processing_frame = False
     
     def on_face_recognized(self, match):
         """Обработка распознанного лица"""
         try:
             # Получение полной информации о пользователе
-            user = self.db.get_user_by_id(match.user_id)
+            user = self.db.get_user_by_id(match.user_id, with_encodings=False)
             if not user:
                 return
             
@@ -8,7 +8,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt5.QtCore import Qt, pyqtSignal, QPropertyAnimation, QPoint
 from PyQt5.QtGui import QFont
 
-from database import Database
+from database import get_database
 from config import PRIMARY_COLOR
 
 class LoginWindow(QWidget):
@@ -16,7 +16,7 @@ class LoginWindow(QWidget):
     
     def __init__(self):
         super().__init__()
-        self.db = Database()
+        self.db = get_database()
         self.init_ui()
     
     def init_ui(self):
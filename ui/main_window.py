@@ -10,7 +10,7 @@ from PyQt5.QtGui import QFont
 
 from datetime import datetime
 
-from database import Database
+from database import get_database
 from config import (WINDOW_TITLE, PRIMARY_COLOR, SECONDARY_COLOR,
                    WINDOW_MIN_WIDTH, WINDOW_MIN_HEIGHT)
 from .add_user_dialog import AddUserDialog
@@ -22,7 +22,7 @@ class MainWindow(QMainWindow):
     def __init__(self, admin_data):
         super().__init__()
         self.admin_data = admin_data
-        self.db = Database()
+        self.db = get_database()
         self.current_page = 0
         
         self.init_ui()
@@ -208,7 +208,7 @@ class MainWindow(QMainWindow):
         
         # Карточки статистики
         stats = [
-            ("Всего пользователей", len(self.db.get_all_users()), "👥", "#3498db"),
+            ("Всего пользователей", self.db.get_user_count(), "👥", "#3498db"),
             ("Распознано сегодня", self.db.get_today_recognition_count(), "🔍", "#2ecc71"),
             ("Уникальных сегодня", self.db.get_unique_users_today(), "✅", "#e74c3c"),
             ("Система активна", "ДА", "⚡", "#f39c12")
@@ -499,7 +499,7 @@ class MainWindow(QMainWindow):
     def update_users_table(self):
         """Обновление таблицы пользователей"""
         try:
-            users = self.db.get_all_users()
+            users = self.db.get_all_users(with_encodings=False)
             
             self.users_table.setRowCount(len(users))
             for i, user in enumerate(users):